@@ -1,12 +1,13 @@
 import pygame
 import sys
+import textcache
 
 pygame.init()
 
 # Constants
 SCREEN_WIDTH, SCREEN_HEIGHT = 960, 540
 FPS = 60
-FONT = pygame.font.SysFont(None, 48)
+FONT = textcache.SysFont(None, 48)
 
 WHITE = (255, 255, 255)
 GREY = (100, 100, 100)
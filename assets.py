@@ -0,0 +1,33 @@
+import pygame
+
+# images as loaded from disk
+_raw = {}
+# images converted to the current display format
+_images = {}
+# scaled/flipped copies keyed by (name, size, flip)
+_variants = {}
+
+
+def get(name, size=None, flip=False):
+    key = (name, size, flip)
+    img = _variants.get(key)
+    if img is not None:
+        return img
+    img = _images.get(name)
+    if img is None:
+        if name not in _raw:
+            _raw[name] = pygame.image.load(name)
+        img = _raw[name].convert_alpha()
+        _images[name] = img
+    if size is not None:
+        img = pygame.transform.scale(img, size)
+    if flip:
+        img = pygame.transform.flip(img, True, False)
+    _variants[key] = img
+    return img
+
+
+# converted images are tied to the display format, so call this after set_mode
+def invalidate():
+    _images.clear()
+    _variants.clear()
@@ -0,0 +1,568 @@
+import heapq
+import random
+import sys
+import time
+from collections import deque
+from cellindex import CellIndex
+
+# game rules for Bomerman, kept free of pygame so they can run without a window.
+# every time-dependent call takes the current tick count (ms) instead of reading a clock.
+
+# board size in tiles (game.py uses a 1000x600 window with 50px tiles)
+COLS, ROWS = 20, 12
+BLOCKSIZE = 50
+
+FUSE = 2500  # ms before a bomb goes off
+RADIUS = 2  # blast reach in tiles
+
+# levels in tuples
+def level1layout():
+    rigid = set()
+    rigid.add((9, 6))
+    rigid.add((12, 5))
+    soft = set()
+    soft.add((6, 3)); soft.add((11, 3)); soft.add((6, 7))
+    soft.add((11, 7)); soft.add((8, 6)); soft.add((10, 6))
+    # clamp to bounds
+    goodrig = set()
+    for t in rigid:
+        x = t[0]; y = t[1]
+        if 2 <= x <= 17 and 2 <= y <= 9:
+            goodrig.add((x, y))
+    goodsoft = set()
+    for t in soft:
+        x = t[0]; y = t[1]
+        if 2 <= x <= 17 and 2 <= y <= 9 and t not in goodrig:
+            goodsoft.add((x, y))
+    return goodrig, goodsoft
+
+def level2layout():
+    rigid = set()
+    for col in (4, 10, 15):
+        for y in range(3, 9):
+            if not (col == 10 and (y == 5 or y == 7)):
+                rigid.add((col, y))
+    soft = set()
+    for t in [(5, 3), (6, 3), (7, 3), (6, 5), (7, 5), (8, 5), (5, 6), (6, 6), (7, 6),
+              (8, 4), (9, 4), (11, 4), (10, 5), (12, 5), (13, 5), (11, 7), (12, 7), (13, 7),
+              (9, 8), (11, 8), (16, 8)]:
+        soft.add(t)
+    goodrig = set()
+    for x, y in rigid:
+        if 2 <= x <= 17 and 2 <= y <= 9:
+            goodrig.add((x, y))
+    goodsoft = set()
+    for x, y in soft:
+        if 2 <= x <= 17 and 2 <= y <= 9 and (x, y) not in goodrig:
+            goodsoft.add((x, y))
+    return goodrig, goodsoft
+
+def level3layout():
+    rigid = set()
+    for x in range(2, 18):
+        for y in range(2, 10):
+            if x % 2 == 0 and y % 2 == 0:
+                rigid.add((x, y))
+    candidates = []
+    for x in range(2, 18):
+        for y in range(2, 10):
+            if (x, y) not in rigid:
+                candidates.append((x, y))
+    soft = set()
+    for x, y in candidates:
+        if not (x <= 4 and y <= 4):
+            if (x + 2 * y) % 2 == 0:
+                soft.add((x, y))
+    centerx = (2 + 17) // 2
+    centery = (2 + 9) // 2
+    for y in range(2, 10):
+        if (centerx, y) in soft:
+            soft.discard((centerx, y))
+    for x in range(2, 18):
+        if (x, centery) in soft:
+            soft.discard((x, centery))
+    for x in range(2, 6):
+        for y in range(2, 6):
+            if (x, y) in soft:
+                soft.discard((x, y))
+    goodrig = set()
+    for x, y in rigid:
+        if 2 <= x <= 17 and 2 <= y <= 9:
+            goodrig.add((x, y))
+    goodsoft = set()
+    for x, y in soft:
+        if 2 <= x <= 17 and 2 <= y <= 9 and (x, y) not in goodrig:
+            goodsoft.add((x, y))
+    return goodrig, goodsoft
+
+levelmap = {1: level1layout, 2: level2layout, 3: level3layout}
+
+def getlev(lv):
+    f = levelmap.get(lv, level1layout)
+    return f()
+
+# occupancy flags, one byte per tile
+WALL = 1
+SOFT = 2
+BOMB = 4
+ENEMY = 8
+SOLID = WALL | SOFT
+
+class Grid:
+    def __init__(self, w, h):
+        self.w = w
+        self.h = h
+        self.cells = bytearray(w * h)
+        self.enemyat = {}  # tile -> enemy standing on it
+        self.free = CellIndex()  # tiles an enemy could spawn on
+        for y in range(h):
+            for x in range(w):
+                self.free.add((x, y))
+
+    def get(self, x, y):
+        if x < 0 or y < 0 or x >= self.w or y >= self.h:
+            return WALL
+        return self.cells[y * self.w + x]
+
+    def has(self, x, y, flag):
+        return self.get(x, y) & flag
+
+    def set(self, x, y, flag):
+        self.cells[y * self.w + x] |= flag
+        self.refresh(x, y)
+
+    def clear(self, x, y, flag):
+        self.cells[y * self.w + x] &= ~flag & 0xFF
+        self.refresh(x, y)
+
+    def refresh(self, x, y):
+        if self.cells[y * self.w + x] & (SOLID | ENEMY):
+            self.free.discard((x, y))
+        else:
+            self.free.add((x, y))
+
+    def put_enemy(self, x, y, enemy):
+        self.set(x, y, ENEMY)
+        self.enemyat[(x, y)] = enemy
+
+    def take_enemy(self, x, y):
+        self.clear(x, y, ENEMY)
+        return self.enemyat.pop((x, y), None)
+
+
+def make_grid(maxx, maxy, rigidint, softint):
+    grid = Grid(maxx, maxy)
+    # border (2-thick) is rigid
+    for x in range(0, maxx):
+        for y in range(0, maxy):
+            if x <= 1 or x >= maxx - 2 or y <= 1 or y >= maxy - 2:
+                grid.set(x, y, WALL)
+    for x, y in rigidint:
+        grid.set(x, y, WALL)
+    for x, y in softint:
+        grid.set(x, y, SOFT)
+    return grid
+
+
+# BFS distances to the player's tile, shared by every chasing enemy.
+# only rebuilt when the player changes tile or the walls change.
+class DistanceField:
+    def __init__(self, grid):
+        self.grid = grid
+        self.dist = [-1] * (grid.w * grid.h)
+        self.source = None
+        self.dirty = True
+
+    def update(self, source):
+        if source == self.source and not self.dirty:
+            return
+        self.source = source
+        self.dirty = False
+        grid = self.grid
+        w = grid.w
+        dist = self.dist
+        for i in range(len(dist)):
+            dist[i] = -1
+        sx, sy = source
+        if grid.has(sx, sy, WALL):
+            return
+        dist[sy * w + sx] = 0
+        queue = deque([source])
+        while queue:
+            x, y = queue.popleft()
+            d = dist[y * w + x] + 1
+            for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if grid.has(nx, ny, SOLID) or dist[ny * w + nx] != -1:
+                    continue
+                dist[ny * w + nx] = d
+                queue.append((nx, ny))
+
+    def get(self, x, y):
+        if x < 0 or y < 0 or x >= self.grid.w or y >= self.grid.h:
+            return -1
+        return self.dist[y * self.grid.w + x]
+
+
+# timed events keyed on game ticks. step() only looks at what is due,
+# so the cost per tick follows the events that fire, not the live entities.
+class Scheduler:
+    def __init__(self):
+        self.heap = []
+        self.count = 0  # keeps events due on the same tick in the order they were added
+
+    def add(self, when, kind, obj=None):
+        heapq.heappush(self.heap, (when, self.count, kind, obj))
+        self.count += 1
+
+    def due(self, now):
+        events = []
+        while self.heap and self.heap[0][0] <= now:
+            when, _, kind, obj = heapq.heappop(self.heap)
+            events.append((kind, obj))
+        return events
+
+
+# input snapshot for one step
+class Inputs:
+    def __init__(self, move=None, bomb=False):
+        self.move = move  # (dx, dy) or None
+        self.bomb = bomb
+
+NOINPUT = Inputs()
+
+
+# player block, position is the top left corner in pixels
+class Player:
+    def __init__(self, x, y, size=BLOCKSIZE):
+        self.size = size
+        self.x = x
+        self.y = y
+        self.ismoving = False
+        self.startpos = (x, y)
+        self.targetpos = (x, y)
+        self.movedur = 450
+        self.movestart = 0
+
+    def tile(self):
+        return (self.x // self.size, self.y // self.size)
+
+    def update(self, now):
+        if self.ismoving:
+            el = now - self.movestart
+            prog = min(el / self.movedur, 1)
+            self.x = int(self.startpos[0] + (self.targetpos[0] - self.startpos[0]) * prog)
+            self.y = int(self.startpos[1] + (self.targetpos[1] - self.startpos[1]) * prog)
+            if prog >= 1:
+                self.ismoving = False
+                self.x, self.y = int(self.targetpos[0]), int(self.targetpos[1])
+
+    def try_move(self, dx, dy, grid, now):
+        if self.ismoving:
+            return
+        newx = self.x + dx * self.size
+        newy = self.y + dy * self.size
+        gx = newx // self.size
+        gy = newy // self.size
+        if not grid.has(gx, gy, SOLID):
+            self.startpos = (self.x, self.y)
+            self.targetpos = (newx, newy)
+            self.ismoving = True
+            self.movestart = now
+
+
+# enemy block, position is the centre of its tile in pixels
+class Enemy:
+    def __init__(self, x, y, col, now, rng, radius=20):
+        self.x = int(x)
+        self.y = int(y)
+        self.col = col
+        self.radius = radius
+        self.alive = True
+        self.nextmove = now + rng.randint(700, 1200)
+
+    def move_to(self, nx, ny, blocksize, grid):
+        grid.take_enemy(self.x // blocksize, self.y // blocksize)
+        self.x = int(nx * blocksize + blocksize // 2)
+        self.y = int(ny * blocksize + blocksize // 2)
+        grid.put_enemy(nx, ny, self)
+
+    def can_enter(self, nx, ny, cur, grid):
+        if grid.has(nx, ny, SOLID):
+            return False
+        return not grid.has(nx, ny, ENEMY) or (nx, ny) == cur
+
+    def update(self, now, rng, blocksize, grid, field, mode, level):
+        gx = self.x // blocksize
+        gy = self.y // blocksize
+        cur = (int(gx), int(gy))
+        if mode == 'random':
+            if level == 2:
+                moveint = 2800
+            elif level == 3:
+                moveint = 2500
+            else:
+                moveint = 3000
+            if now < self.nextmove:
+                return
+            dirs = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+            rng.shuffle(dirs)
+            for d in dirs:
+                nx = gx + d[0]
+                ny = gy + d[1]
+                if self.can_enter(nx, ny, cur, grid):
+                    self.move_to(nx, ny, blocksize, grid)
+                    break
+            self.nextmove = now + moveint
+            return
+        # chase mode
+        if now < self.nextmove:
+            return
+        self.nextmove = now + rng.randint(1200, 1400)
+        # step to the neighbour closest to the player, if it can be reached
+        best = None
+        bestd = field.get(gx, gy)
+        for d in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            nx = gx + d[0]
+            ny = gy + d[1]
+            nd = field.get(nx, ny)
+            if nd == -1 or (bestd != -1 and nd >= bestd):
+                continue
+            if self.can_enter(nx, ny, cur, grid):
+                best = (nx, ny)
+                bestd = nd
+        if best is not None:
+            self.move_to(best[0], best[1], blocksize, grid)
+        else:
+            dirs = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+            rng.shuffle(dirs)
+            for d in dirs:
+                nx = gx + d[0]
+                ny = gy + d[1]
+                if self.can_enter(nx, ny, cur, grid):
+                    self.move_to(nx, ny, blocksize, grid)
+                    break
+
+
+# bomb/explosion logic
+class Bomb:
+    def __init__(self, gx, gy, placed):
+        self.gx = gx
+        self.gy = gy
+        self.placed = placed
+
+# tiles a blast from (x, y) can reach in each direction before a wall.
+# walls never change during a level so these are worked out once per tile.
+def blast_rays(grid, x, y, radius):
+    rays = []
+    for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+        ray = []
+        for r in range(1, radius + 1):
+            tx = x + dx * r
+            ty = y + dy * r
+            if grid.has(tx, ty, WALL):
+                break
+            ray.append((tx, ty))
+        rays.append(ray)
+    return rays
+
+class Explosion:
+    def __init__(self, tiles, startt, dur=500):
+        self.tiles = tiles
+        self.startt = startt
+        self.dur = dur
+
+
+# whole game state for one level; step() advances it to the given tick
+class World:
+    def __init__(self, level, maxe, ecol, now=0, seed=None, cols=COLS, rows=ROWS, blocksize=BLOCKSIZE,
+                 maxbombs=1, radius=RADIUS):
+        self.level = level
+        self.maxe = maxe
+        self.ecol = ecol
+        self.blocksize = blocksize
+        self.rng = random.Random(seed)
+        rigidint, softint = getlev(level)
+        self.grid = make_grid(cols, rows, rigidint, softint)
+        self.field = DistanceField(self.grid)
+        self.player = Player(2 * blocksize, 2 * blocksize, blocksize)
+        self.enemies = []
+        self.bombs = {}  # tile -> bomb
+        self.maxbombs = maxbombs
+        self.radius = radius
+        self.events = Scheduler()
+        self.rays = {}  # tile -> precomputed blast rays
+        self.explosions = []
+        self.cleared = []  # soft tiles destroyed since the renderer last looked
+        self.score = 0
+        self.status = 'playing'  # or 'won' / 'dead'
+        if maxe > 0:
+            e = self.spawn_enemy(now)
+            if e:
+                self.add_enemy(e)
+        self.spawndelay = self.rng.randint(5000, 10000)
+        self.spawnwaiting = False  # spawn is due but the level is full
+        if maxe > 1:
+            self.events.add(now + self.spawndelay, 'spawn')
+        self.chase = False
+        self.modetimer = now
+        if level == 3:
+            self.events.add(now + 30000, 'mode')
+
+    def add_enemy(self, e):
+        self.enemies.append(e)
+        self.events.add(e.nextmove, 'enemy', e)
+
+    def spawn_enemy(self, now):
+        blocksize = self.blocksize
+        grid = self.grid
+        free = grid.free
+        px, py = self.player.tile()
+        # hold back the tiles within 3 of the player while picking
+        held = []
+        for x in range(px - 3, px + 4):
+            for y in range(py - 3, py + 4):
+                if (x, y) in free:
+                    free.discard((x, y))
+                    held.append((x, y))
+        tile = free.choice(self.rng) if len(free) else None
+        for t in held:
+            free.add(t)
+        if tile is None:
+            return None
+        x, y = tile
+        ex = x * blocksize + blocksize // 2
+        ey = y * blocksize + blocksize // 2
+        e = Enemy(ex, ey, self.ecol, now, self.rng)
+        grid.put_enemy(x, y, e)
+        return e
+
+    # ms left before the level 3 chase/random mode flips
+    def mode_remaining(self, now):
+        return max(0, (10000 if self.chase else 30000) - (now - self.modetimer))
+
+    def detonate(self, bomb, now):
+        grid = self.grid
+        hit = set()
+        victims = []
+        # bombs caught in a blast go off in the same tick
+        # a bomb leaves self.bombs as soon as it is queued, so it is never queued twice
+        chain = [bomb]
+        del self.bombs[(bomb.gx, bomb.gy)]
+        while chain:
+            b = chain.pop()
+            tile = (b.gx, b.gy)
+            grid.clear(b.gx, b.gy, BOMB)
+            rays = self.rays.get(tile)
+            if rays is None:
+                rays = blast_rays(grid, b.gx, b.gy, self.radius)
+                self.rays[tile] = rays
+            expl = [tile]
+            for ray in rays:
+                for t in ray:
+                    expl.append(t)
+                    if grid.has(t[0], t[1], SOFT):
+                        break
+            ex = Explosion(expl, now)
+            self.explosions.append(ex)
+            self.events.add(now + ex.dur, 'explosion', ex)
+            for tx, ty in expl:
+                hit.add((tx, ty))
+                cell = grid.get(tx, ty)
+                if cell & SOFT:
+                    grid.clear(tx, ty, SOFT)
+                    self.cleared.append((tx, ty))
+                    self.field.dirty = True
+                if cell & ENEMY:
+                    victims.append(grid.take_enemy(tx, ty))
+                if cell & BOMB and (tx, ty) in self.bombs:
+                    chain.append(self.bombs.pop((tx, ty)))
+        if victims:
+            for e in victims:
+                e.alive = False
+            if self.spawnwaiting:
+                self.spawnwaiting = False
+                self.events.add(now, 'spawn')
+            dead = set(id(e) for e in victims)
+            self.enemies = [e for e in self.enemies if id(e) not in dead]
+            if self.level == 3:
+                self.score += 150 * len(victims)
+            else:
+                self.score += 100 * len(victims)
+            if self.level == 1:
+                self.status = 'won'
+                return
+        if self.player.tile() in hit:
+            self.status = 'dead'
+
+    def step(self, now, inp=NOINPUT):
+        if self.status != 'playing':
+            return self.status
+        due = {'mode': [], 'spawn': [], 'bomb': [], 'explosion': [], 'enemy': []}
+        for kind, obj in self.events.due(now):
+            due[kind].append(obj)
+        if due['mode']:
+            self.chase = not self.chase
+            self.modetimer = now
+            self.events.add(now + (10000 if self.chase else 30000), 'mode')
+        if due['spawn']:
+            if len(self.enemies) >= self.maxe:
+                self.spawnwaiting = True
+            else:
+                newe = self.spawn_enemy(now)
+                if newe:
+                    self.add_enemy(newe)
+                    self.spawndelay = self.rng.randint(5000, 10000)
+                    self.events.add(now + self.spawndelay, 'spawn')
+                else:
+                    self.events.add(now + 1, 'spawn')
+        player = self.player
+        if inp.bomb and len(self.bombs) < self.maxbombs and player.tile() not in self.bombs:
+            gx, gy = player.tile()
+            bomb = Bomb(gx, gy, now)
+            self.bombs[(gx, gy)] = bomb
+            self.grid.set(gx, gy, BOMB)
+            self.events.add(now + FUSE, 'bomb', bomb)
+        if inp.move is not None and not player.ismoving:
+            player.try_move(inp.move[0], inp.move[1], self.grid, now)
+        player.update(now)
+        for bomb in due['bomb']:
+            # skip bombs that already went off in a chain
+            if self.bombs.get((bomb.gx, bomb.gy)) is bomb:
+                self.detonate(bomb, now)
+                if self.status != 'playing':
+                    return self.status
+        for ex in due['explosion']:
+            self.explosions.remove(ex)
+        mode = 'chase' if self.chase else 'random'
+        if self.chase and due['enemy']:
+            self.field.update(player.tile())
+        for e in due['enemy']:
+            if not e.alive:
+                continue
+            e.update(now, self.rng, self.blocksize, self.grid, self.field, mode, self.level)
+            self.events.add(e.nextmove, 'enemy', e)
+        px, py = player.tile()
+        if self.grid.has(px, py, ENEMY):
+            self.status = 'dead'
+        return self.status
+
+
+# soak test: run random inputs through every level without a window
+# usage: python bomber.py [ticks per level] [seed]
+if __name__ == "__main__":
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    rng = random.Random(seed)
+    moves = [None, (1, 0), (-1, 0), (0, 1), (0, -1)]
+    # the last three runs allow several bombs at once so chain reactions get exercised
+    for level, maxe, maxbombs in ((1, 1, 1), (2, 3, 1), (3, 5, 1), (1, 1, 4), (2, 3, 4), (3, 5, 4)):
+        world = World(level, maxe, None, 0, seed, maxbombs=maxbombs)
+        start = time.perf_counter()
+        now = 0
+        for n in range(ticks):
+            now += 16  # one 60 fps frame
+            inp = Inputs(rng.choice(moves), rng.random() < 0.01 * maxbombs)
+            if world.step(now, inp) != 'playing':
+                world = World(level, maxe, None, now, rng.randint(0, 1 << 30), maxbombs=maxbombs)
+        took = time.perf_counter() - start
+        print(f"level {level}, {maxbombs} bombs: {ticks} ticks in {took:.2f}s ({ticks / took:.0f} ticks/s)")
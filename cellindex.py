@@ -0,0 +1,40 @@
+# set of cells that also supports picking a random member in O(1), shared by
+# bomber.py (spawn tiles), maze.py (free maze cells) and placement.py (free spawn spots).
+# members live in a list and pos maps each one to its slot, so removing swaps the
+# last member into the hole instead of shifting the list.
+
+
+class CellIndex:
+    def __init__(self, cells=()):
+        self.cells = []
+        self.pos = {}  # cell -> index in cells
+        for cell in cells:
+            self.add(cell)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, cell):
+        return cell in self.pos
+
+    # members by slot, the order changes as cells come and go
+    def __getitem__(self, i):
+        return self.cells[i]
+
+    def add(self, cell):
+        if cell in self.pos:
+            return
+        self.pos[cell] = len(self.cells)
+        self.cells.append(cell)
+
+    def discard(self, cell):
+        i = self.pos.pop(cell, None)
+        if i is None:
+            return
+        last = self.cells.pop()
+        if i < len(self.cells):
+            self.cells[i] = last
+            self.pos[last] = i
+
+    def choice(self, rng):
+        return self.cells[rng.randrange(len(self.cells))]
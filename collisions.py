@@ -1,7 +1,11 @@
 import pygame  # Importing the Pygame library
 import sys  # Importing the sys module to handle system-specific parameters
-import random  # Importing the random module for random number generation
-import math
+import scenes  # Non-recursive scene switching shared with game.py
+import profiler  # Frame timing overlay (F3) and trace export
+import textcache  # Loads each font once and caches rendered text
+import entities  # Pickups and hazards with a grid broad phase and real shapes
+import steering  # Float positions and velocities for the homing snitches
+import placement  # Precomputed spread-out spawn spots
 # Initialize Pygame
 pygame.init()
 
@@ -34,26 +38,33 @@ circle_radius = 25  # Radius of the circles
 circle_1_points = 1  # Points awarded for colliding with the first circle
 circle_2_points = 2  # Points awarded for colliding with the second circle
 circle_3_points = 150
-# Randomly placing the circles on the screen
-circle_1 = pygame.Rect(random.randint(0, WIDTH - circle_radius*2), random.randint(0, HEIGHT - circle_radius*2), circle_radius*2, circle_radius*2)
-circle_2 = pygame.Rect(random.randint(0, WIDTH - circle_radius*2), random.randint(0, HEIGHT - circle_radius*2), circle_radius*2, circle_radius*2)
-circle_3 = pygame.Rect(random.randint(0, WIDTH - 20*2), random.randint(0, HEIGHT - 20*2), 20*2, 20*2)
-
+snitch_radius = 20  # Radius of the golden snitch
 
 # Red Circle settings (new circle)
 red_circle_radius = 25  # Radius of the red circle
-# Randomly placing the red circle on the screen
-red_circle = pygame.Rect(random.randint(0, WIDTH - red_circle_radius*2), random.randint(0, HEIGHT - red_circle_radius*2), red_circle_radius*2, red_circle_radius*2)
 
 # Enemy settings (triangles)
 triangle_size = 50  # Defining the size of the triangles
-# Randomly placing the triangles on the screen
-black_triangle = pygame.Rect(random.randint(0, WIDTH - triangle_size), random.randint(0, HEIGHT - triangle_size), triangle_size, triangle_size)
-blue_triangle = pygame.Rect(random.randint(0, WIDTH - triangle_size), random.randint(0, HEIGHT - triangle_size), triangle_size, triangle_size)
+
+stress_pickups = 0  # Extra 1 point circles for stress testing, try 2000
+stress_snitches = 0  # Extra homing snitches for swarm testing, try 300
+
+# Pickups and hazards: kind -> (shape, size, colour)
+KINDS = {
+    "circle_1": ("circle", circle_radius * 2, BLUE),
+    "circle_2": ("circle", circle_radius * 2, GREEN),
+    "snitch": ("circle", snitch_radius * 2, YELLOW),
+    "red_circle": ("circle", red_circle_radius * 2, RED),
+    "black_triangle": ("triangle", triangle_size, BLACK),
+    "blue_triangle": ("triangle", triangle_size, LIGHT_BLUE),
+}
+things = entities.EntityIndex()  # Everything the player can run into
+# Spawn spots at least 60 pixels apart, a new pickup keeps 10 pixels clear of everything
+placer = placement.Placer(WIDTH, HEIGHT, spacing=60, margin=triangle_size // 2, clearance=10)
 
 # Font for displaying score and lives
-font = pygame.font.SysFont('Arial', 24)  # Creating a font for smaller text (score, lives)
-large_font = pygame.font.SysFont('Arial', 36)  # Creating a font for larger text (game over screen, title)
+font = textcache.SysFont('Arial', 24)  # Creating a font for smaller text (score, lives)
+large_font = textcache.SysFont('Arial', 36)  # Creating a font for larger text (game over screen, title)
 
 # Function to draw a triangle
 def draw_triangle(color, rect):
@@ -64,6 +75,18 @@ def draw_triangle(color, rect):
     ]
     pygame.draw.polygon(screen, color, points)  # Drawing the triangle on the screen
 
+# Place a new pickup or hazard on a free spot, away from the areas in avoid (the player)
+def spawn(kind, avoid=()):
+    shape, size, colour = KINDS[kind]
+    entity = entities.Entity(kind, shape, 0, 0, size)
+    entity.x, entity.y = placer.spot(size, things, avoid, entity)
+    return things.add(entity)
+
+# Move a pickup or hazard to a new free spot
+def respawn(entity, avoid=()):
+    x, y = placer.spot(entity.size, things, avoid, entity)
+    things.move(entity, x, y)
+
 # Function to display the start screen
 def start_screen():
     screen.fill(DARK_GRAY)  # Filling the background with dark gray color
@@ -78,15 +101,18 @@ def start_screen():
 
     pygame.display.flip()  # Updating the screen to show the start screen
 
-    waiting_for_start = True  # Flag to keep the start screen up
-    while waiting_for_start:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:  # Check if the window is closed
-                pygame.quit()  # Quit Pygame
-                sys.exit()  # Exit the program
-            if event.type == pygame.MOUSEBUTTONDOWN:  # Check if the mouse was clicked
-                if start_button.collidepoint(event.pos):  # Check if the start button was clicked
-                    waiting_for_start = False  # Start the game
+    # Nothing on the start screen moves, so it is drawn once above and the loop
+    # sleeps in event.wait until there is input instead of spinning a core
+    while not scenes.changed():  # Keep the start screen up until a new scene is picked
+        event = pygame.event.wait()
+        if event.type == pygame.VIDEOEXPOSE:  # Window was uncovered, show the finished screen again
+            pygame.display.flip()
+        if event.type == pygame.QUIT:  # Check if the window is closed
+            pygame.quit()  # Quit Pygame
+            sys.exit()  # Exit the program
+        if event.type == pygame.MOUSEBUTTONDOWN:  # Check if the mouse was clicked
+            if start_button.collidepoint(event.pos):  # Check if the start button was clicked
+                scenes.goto(main_game)  # Start the game
 
 # Function to display the game over screen
 def game_over_screen(final_score,choice):
@@ -116,48 +142,64 @@ def game_over_screen(final_score,choice):
 
     pygame.display.flip()  # Updating the screen to show the game over screen
 
-    waiting_for_input = True  # Flag to keep the game over screen up
-    while waiting_for_input:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:  # Check if the window is closed
+    while not scenes.changed():  # Keep the game over screen up until a new scene is picked
+        event = pygame.event.wait()  # Sleep until there is input, the screen is already drawn
+        if event.type == pygame.VIDEOEXPOSE:  # Window was uncovered, show the finished screen again
+            pygame.display.flip()
+        if event.type == pygame.QUIT:  # Check if the window is closed
+            pygame.quit()  # Quit Pygame
+            sys.exit()  # Exit the program
+        if event.type == pygame.MOUSEBUTTONDOWN:  # Check if the mouse was clicked
+            if quit_button.collidepoint(event.pos):  # Check if the "Quit" button was clicked
                 pygame.quit()  # Quit Pygame
                 sys.exit()  # Exit the program
-            if event.type == pygame.MOUSEBUTTONDOWN:  # Check if the mouse was clicked
-                if quit_button.collidepoint(event.pos):  # Check if the "Quit" button was clicked
-                    pygame.quit()  # Quit Pygame
-                    sys.exit()  # Exit the program
-                if restart_button.collidepoint(event.pos):  # Check if the "Restart" button was clicked
-                    waiting_for_input = False  # Restart the game
+            if restart_button.collidepoint(event.pos):  # Check if the "Restart" button was clicked
+                scenes.goto(main_game)  # Restart the game
 
 
 # Main game loop
 def main_game():
-    global square_x, square_y, score, lives, circle_1, circle_2, red_circle, black_triangle, blue_triangle, life_snitch
+    global square_x, square_y, score, lives, things, life_snitch
     square_x = WIDTH // 2 - square_size // 2  # Resetting the player's horizontal position to the center
     square_y = HEIGHT // 2 - square_size // 2  # Resetting the player's vertical position to the center
     score = 0  # Resetting the score
     lives = 25  # Resetting the lives
     life_snitch = 3
-    # Randomly placing the circles and triangles
-    circle_1 = pygame.Rect(random.randint(0, WIDTH - circle_radius*2), random.randint(0, HEIGHT - circle_radius*2), circle_radius*2, circle_radius*2)
-    circle_2 = pygame.Rect(random.randint(0, WIDTH - circle_radius*2), random.randint(0, HEIGHT - circle_radius*2), circle_radius*2, circle_radius*2)
-    circle_3 = pygame.Rect(random.randint(0, WIDTH - 20*2), random.randint(0, HEIGHT - 20*2), 20*2, 20*2)
-    red_circle = pygame.Rect(random.randint(0, WIDTH - red_circle_radius*2), random.randint(0, HEIGHT - red_circle_radius*2), red_circle_radius*2, red_circle_radius*2)
-    black_triangle = pygame.Rect(random.randint(0, WIDTH - triangle_size), random.randint(0, HEIGHT - triangle_size), triangle_size, triangle_size)
-    blue_triangle = pygame.Rect(random.randint(0, WIDTH - triangle_size), random.randint(0, HEIGHT - triangle_size), triangle_size, triangle_size)
+    # Placing the circles and triangles on free spots away from the player
+    things = entities.EntityIndex()
+    placer.reset()  # Spots held by the last game's entities are free again
+    player = [(square_x, square_y, square_size, square_size)]
+    spawn("circle_1", player)
+    spawn("circle_2", player)
+    chasers = steering.Swarm(speed * 0.6, radius=snitch_radius, bounds=(WIDTH, HEIGHT))  # Move 0.6 of the player's speed
+    snitches = []
+    for _ in range(1 + stress_snitches):
+        snitch = spawn("snitch", player)
+        snitch.agent = chasers.add(*snitch.center())  # Its slot in the swarm arrays
+        snitches.append(snitch)
+    spawn("red_circle", player)
+    for _ in range(stress_pickups):
+        spawn("circle_1", player)
+    spawn("black_triangle", player)
+    spawn("blue_triangle", player)
 
     # Set up the timer
     timer_duration = 10  # 10 seconds countdown
     timer_start_ticks = pygame.time.get_ticks()  # Start time in milliseconds
+    remaining_time = timer_duration
 
     # Game loop
     clock = pygame.time.Clock()  # Create a clock object to manage the frame rate
+    profiler.reset()  # Don't count the menus as part of the first frame
     while True:
+        profiler.mark("events")
         for event in pygame.event.get():
+            profiler.handle(event)  # F3 toggles the frame timing overlay
             if event.type == pygame.QUIT:  # Check if the window is closed
                 pygame.quit()  # Quit Pygame
                 sys.exit()  # Exit the program
 
+        profiler.mark("update")
         # Get key presses for movement
         keys = pygame.key.get_pressed()
         if keys[pygame.K_LEFT]:  # Move the square left
@@ -175,89 +217,74 @@ def main_game():
         # Create square rectangle for collision checking
         square_rect = pygame.Rect(square_x, square_y, square_size, square_size)
 
-        # Check for collisions with circles and update score or time
-        if square_rect.colliderect(circle_1):  # Check collision with circle 1
-            score += circle_1_points  # Increase score
-            # Reposition the circle randomly
-            circle_1 = pygame.Rect(random.randint(0, WIDTH - circle_radius*2), random.randint(0, HEIGHT - circle_radius*2), circle_radius*2, circle_radius*2)
-
-        if square_rect.colliderect(circle_2):  # Check collision with circle 2
-            score += circle_2_points  # Increase score
-            # Reposition the circle randomly
-            circle_2 = pygame.Rect(random.randint(0, WIDTH - circle_radius*2), random.randint(0, HEIGHT - circle_radius*2), circle_radius*2, circle_radius*2)
-
-        if square_rect.colliderect(circle_3) and remaining_time > 15:  # Check collision with circle 2
-            score += circle_3_points  # Increase score
-            # Reposition the circle randomly
-            circle_3 = pygame.Rect(random.randint(0, WIDTH - 20*2), random.randint(0, HEIGHT - 20*2), 20*2, 20*2)
-            life_snitch -= 1
-            if life_snitch == 0:
-                game_over_screen(score,"yes")
-                main_game()
-
-        if square_rect.colliderect(red_circle):  # Check collision with the red circle
-            timer_duration += 5  # Add 5 seconds to the timer
-            # Reposition the red circle randomly
-            red_circle = pygame.Rect(random.randint(0, WIDTH - red_circle_radius*2), random.randint(0, HEIGHT - red_circle_radius*2), red_circle_radius*2, red_circle_radius*2)
-
-        # Check for collisions with enemies (triangles)
-        if square_rect.colliderect(black_triangle):  # Check collision with black triangle
-            game_over_screen(score,"no")  # Game Over, show the Game Over screen
-            main_game()  # Restart the game
-
-        if square_rect.colliderect(blue_triangle):  # Check collision with blue triangle
-            lives -= 5  # Decrease lives
-            if lives <= 0:  # If lives reach zero
-                game_over_screen(score,"no")  # Game Over
-                main_game()  # Restart the game
-            # Reposition the blue triangle randomly
-            blue_triangle = pygame.Rect(random.randint(0, WIDTH - triangle_size), random.randint(0, HEIGHT - triangle_size), triangle_size, triangle_size)
-
         # Calculate the remaining time
         elapsed_time = (pygame.time.get_ticks() - timer_start_ticks) / 1000  # Time in seconds
         remaining_time = max(0, timer_duration - elapsed_time)  # Remaining time in seconds
         if remaining_time > 22:
-
-            circle_3_center = circle_3.center  # Get the current position of the red circle
             player_center = (square_x + square_size // 2, square_y + square_size // 2)  # Calculate the center of the player's square
-
-            # Calculate direction vector from red circle to player
-            direction_x = player_center[0] - circle_3_center[0]
-            direction_y = player_center[1] - circle_3_center[1]
-
-            # Calculate the distance between the red circle and the player
-            distance = math.sqrt(direction_x ** 2 + direction_y ** 2)
-
-            if distance != 0:  # Avoid division by zero
-                # Normalize the direction vector (make it a unit vector)
-                direction_x /= distance
-                direction_y /= distance
-
-                # Move the red circle by 0.75 of the player's speed in the direction of the player
-                circle_3.x += direction_x * (speed * 0.6)
-                circle_3.y += direction_y * (speed * 0.6)
+            chasers.update(player_center[0], player_center[1])  # Every snitch homes in on the player in one pass
+            # Copy the new positions to the snitches for collisions and drawing
+            for snitch in snitches:
+                things.move(snitch, chasers.px[snitch.agent] - snitch_radius, chasers.py[snitch.agent] - snitch_radius)
 
         # If timer reaches zero, trigger Game Over screen
         if remaining_time == 0:
-            game_over_screen(score,"no")  # Show the Game Over screen
-            main_game()  # Restart the game
+            scenes.goto(lambda final_score=score: game_over_screen(final_score,"no"))  # Show the Game Over screen
+            return
+
+        # Check for collisions with circles and triangles, only the ones near the player are tested
+        profiler.mark("collision")
+        player = [(square_x, square_y, square_size, square_size)]
+        for thing in things.touching(square_x, square_y, square_size, square_size):
+            if thing.kind == "circle_1":
+                score += circle_1_points  # Increase score
+                respawn(thing, player)  # Reposition the circle randomly
+
+            elif thing.kind == "circle_2":
+                score += circle_2_points  # Increase score
+                respawn(thing, player)  # Reposition the circle randomly
+
+            elif thing.kind == "snitch" and remaining_time > 15:  # The snitch can only be caught while it is shown
+                score += circle_3_points  # Increase score
+                respawn(thing, player)  # Reposition the circle randomly
+                chasers.place(thing.agent, *thing.center())
+                life_snitch -= 1
+                if life_snitch == 0:
+                    scenes.goto(lambda final_score=score: game_over_screen(final_score,"yes"))
+                    return
+
+            elif thing.kind == "red_circle":
+                timer_duration += 5  # Add 5 seconds to the timer
+                respawn(thing, player)  # Reposition the red circle randomly
+
+            elif thing.kind == "black_triangle":
+                scenes.goto(lambda final_score=score: game_over_screen(final_score,"no"))  # Game Over, show the Game Over screen
+                return
+
+            elif thing.kind == "blue_triangle":
+                lives -= 5  # Decrease lives
+                if lives <= 0:  # If lives reach zero
+                    scenes.goto(lambda final_score=score: game_over_screen(final_score,"no"))  # Game Over
+                    return
+                respawn(thing, player)  # Reposition the blue triangle randomly
 
         # Clear the screen
+        profiler.mark("draw")
         screen.fill(WHITE)
 
         # Draw the square (player)
         pygame.draw.rect(screen, RED, square_rect)
 
-        # Draw the circles
-        pygame.draw.circle(screen, BLUE, circle_1.center, circle_radius)
-        pygame.draw.circle(screen, GREEN, circle_2.center, circle_radius)
-        if remaining_time > 15:
-           pygame.draw.circle(screen, YELLOW, circle_3.center, 20)
-        pygame.draw.circle(screen, RED, red_circle.center, red_circle_radius)  # Draw the red circle
-
-        # Draw the triangles (enemies)
-        draw_triangle(BLACK, black_triangle)
-        draw_triangle(LIGHT_BLUE, blue_triangle)
+        # Draw the circles and triangles (enemies)
+        for thing in things.items:
+            if thing.kind == "snitch" and remaining_time <= 15:
+                continue  # The snitch is hidden for the last 15 seconds
+            colour = KINDS[thing.kind][2]
+            if thing.shape == "circle":
+                cx, cy = thing.center()
+                pygame.draw.circle(screen, colour, (int(cx), int(cy)), thing.size // 2)
+            else:
+                draw_triangle(colour, pygame.Rect(int(thing.x), int(thing.y), thing.size, thing.size))
 
         # Draw the score and lives
         score_text = font.render(f"Score: {score}", True, (0, 0, 0))
@@ -270,11 +297,13 @@ def main_game():
         screen.blit(timer_text, (WIDTH // 2 - timer_text.get_width() // 2, 10))  # Display timer in the center top
 
         # Update the display
+        profiler.draw(screen)  # Frame timing overlay, only shown after F3
+        profiler.mark("present")
         pygame.display.flip()
 
         # Frame rate
         clock.tick(60)  # Set the frame rate to 60 frames per second
+        profiler.frame(60)
 
 # Run the game
-start_screen()  # Show the start screen first
-main_game()  # Start the game
+scenes.run(start_screen)  # Show the start screen first, it moves on to the game
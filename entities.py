@@ -0,0 +1,116 @@
+# pickups and hazards for collisions.py, kept free of pygame.
+# every entity sits in a uniform grid of CELL sized squares, so a collision
+# check only looks at the entities filed in the cells the player covers
+# (broad phase) and then tests the real circle or triangle against the
+# player's square (narrow phase) instead of the bounding boxes.
+
+CELL = 64
+
+
+class Entity:
+    def __init__(self, kind, shape, x, y, size):
+        self.kind = kind
+        self.shape = shape  # "circle" or "triangle"
+        self.x = x  # top left of the bounding box, like a pygame.Rect
+        self.y = y
+        self.size = size  # width and height of the bounding box
+        self.cells = ()  # grid cells it is filed under
+        self.order = 0  # position in the index, hits are handled in this order
+
+    def center(self):
+        half = self.size / 2
+        return (self.x + half, self.y + half)
+
+    # triangle corners, the same ones draw_triangle uses
+    def points(self):
+        x, y, s = self.x, self.y, self.size
+        return ((x + s / 2, y), (x, y + s), (x + s, y + s))
+
+    def hits(self, x, y, w, h):
+        if self.shape == "circle":
+            cx, cy = self.center()
+            return circle_rect(cx, cy, self.size / 2, x, y, w, h)
+        return triangle_rect(self.points(), x, y, w, h)
+
+
+def circle_rect(cx, cy, r, x, y, w, h):
+    # closest point of the rect to the centre
+    dx = cx - max(x, min(cx, x + w))
+    dy = cy - max(y, min(cy, y + h))
+    return dx * dx + dy * dy < r * r
+
+
+# separating axis test: the rect's two axes and the normal of each triangle edge
+def triangle_rect(points, x, y, w, h):
+    corners = ((x, y), (x + w, y), (x + w, y + h), (x, y + h))
+    (x1, y1), (x2, y2), (x3, y3) = points
+    axes = ((1, 0), (0, 1), (y1 - y2, x2 - x1), (y2 - y3, x3 - x2), (y3 - y1, x1 - x3))
+    for ax, ay in axes:
+        a = [px * ax + py * ay for px, py in points]
+        b = [px * ax + py * ay for px, py in corners]
+        if max(a) <= min(b) or max(b) <= min(a):
+            return False
+    return True
+
+
+class EntityIndex:
+    def __init__(self, cell=CELL):
+        self.cell = cell
+        self.buckets = {}
+        self.items = []  # every entity, in the order they were added (draw order)
+        self.added = 0
+
+    def span(self, x, y, w, h):
+        c = self.cell
+        return [(cx, cy)
+                for cy in range(int(y // c), int((y + h) // c) + 1)
+                for cx in range(int(x // c), int((x + w) // c) + 1)]
+
+    def add(self, entity):
+        self.added += 1
+        entity.order = self.added
+        self.items.append(entity)
+        self.file(entity)
+        return entity
+
+    def remove(self, entity):
+        self.unfile(entity)
+        self.items.remove(entity)
+
+    def move(self, entity, x, y):
+        entity.x = x
+        entity.y = y
+        cells = self.span(x, y, entity.size, entity.size)
+        if cells != entity.cells:
+            self.unfile(entity)
+            self.file(entity, cells)
+
+    def file(self, entity, cells=None):
+        if cells is None:
+            cells = self.span(entity.x, entity.y, entity.size, entity.size)
+        entity.cells = cells
+        for key in cells:
+            self.buckets.setdefault(key, set()).add(entity)
+
+    def unfile(self, entity):
+        for key in entity.cells:
+            bucket = self.buckets[key]
+            bucket.discard(entity)
+            if not bucket:
+                del self.buckets[key]
+        entity.cells = ()
+
+    # broad phase: entities whose cells overlap the area, may not really touch it
+    def near(self, x, y, w, h):
+        found = set()
+        for key in self.span(x, y, w, h):
+            bucket = self.buckets.get(key)
+            if bucket:
+                found.update(bucket)
+        return found
+
+    # entities whose actual shape overlaps the rect, oldest first
+    def touching(self, x, y, w, h):
+        hits = [e for e in self.near(x, y, w, h) if e.hits(x, y, w, h)]
+        hits.sort(key=lambda e: e.order)
+        return hits
@@ -1,6 +1,14 @@
 import pygame
 import random
 import sys
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+import profiler
+import mazegen
+import mazefile
+import mazepath
+import textcache
+from cellindex import CellIndex
 
 # Constants
 WIDTH, HEIGHT = 800, 600
@@ -26,21 +34,17 @@ RIGHT = (1, 0)
 
 # Enemy class
 class Enemy:
-    def __init__(self, maze):
-        self.x = random.randint(1, GRID_WIDTH - 2)
-        self.y = random.randint(1, GRID_HEIGHT - 2)
-        while maze[self.y][self.x] == 1:  # Ensure it doesn't spawn in a wall
-            self.x = random.randint(1, GRID_WIDTH - 2)
-            self.y = random.randint(1, GRID_HEIGHT - 2)
+    def __init__(self, occupancy, avoid=None):
         self.alive = True
         self.teleport_time = pygame.time.get_ticks()
+        if not occupancy.place(self, avoid):  # Spawn on a free path cell
+            raise ValueError("no free cell left for an enemy, check occupancy.room() first")
 
-    def teleport(self, maze):
-        self.x = random.randint(1, GRID_WIDTH - 2)
-        self.y = random.randint(1, GRID_HEIGHT - 2)
-        while maze[self.y][self.x] == 1:  # Ensure it doesn't teleport into a wall
-            self.x = random.randint(1, GRID_WIDTH - 2)
-            self.y = random.randint(1, GRID_HEIGHT - 2)
+    def teleport(self, occupancy, avoid=None):
+        x, y = self.x, self.y
+        occupancy.leave(self)
+        if not occupancy.place(self, avoid):  # Nowhere else to go, stay put
+            occupancy.put(self, x, y)
 
     def draw(self, screen):
         if self.alive:
@@ -53,70 +57,236 @@ class Enemy:
                                                        self.y * GRID_SIZE + GRID_SIZE + GRID_SIZE // 2),
                                GRID_SIZE // 4)
 
-# Bullet class
-class Bullet:
-    def __init__(self, x, y, direction):
-        self.x = x
-        self.y = y
-        self.direction = direction
-
-    def move(self):
-        self.x += self.direction[0] * BULLET_SPEED / FPS  # Move according to FPS
-        self.y += self.direction[1] * BULLET_SPEED / FPS
+# Enemy occupancy
+# Every level keeps a map of cell -> living enemy and a list of the open cells
+# nobody stands on, so spawning picks straight from the list and checking the
+# player's cell is one lookup, however many enemies there are.
+class Occupancy:
+    def __init__(self, maze):
+        self.width = maze.width
+        self.enemyat = {}
+        self.free = CellIndex(i for i, c in enumerate(maze.cells) if c == 0)
+
+    # free cells an enemy could be placed on, not counting avoid
+    def room(self, avoid=None):
+        n = len(self.free)
+        if avoid is not None and avoid[1] * self.width + avoid[0] in self.free:
+            n -= 1
+        return n
+
+    # put an enemy on a given free cell
+    def put(self, enemy, x, y):
+        c = y * self.width + x
+        self.free.discard(c)
+        self.enemyat[c] = enemy
+        enemy.x = x
+        enemy.y = y
+
+    # put an enemy on a random free cell, never on avoid (the player).
+    # False if there is no such cell, the enemy is left where it was
+    def place(self, enemy, avoid=None):
+        blocked = None
+        if avoid is not None:
+            blocked = avoid[1] * self.width + avoid[0]
+            if blocked in self.free:
+                self.free.discard(blocked)
+            else:
+                blocked = None
+        placed = bool(self.free)
+        if placed:
+            c = self.free.choice(random)
+            self.put(enemy, c % self.width, c // self.width)
+        if blocked is not None:
+            self.free.add(blocked)
+        return placed
+
+    def leave(self, enemy):
+        c = enemy.y * self.width + enemy.x
+        if self.enemyat.get(c) is enemy:
+            del self.enemyat[c]
+            self.free.add(c)
+
+    def enemy_at(self, x, y):
+        return self.enemyat.get(y * self.width + x)
+
+# Bullets
+# Positions and directions live in preallocated arrays, one slot per bullet.
+# Slots of dead bullets go back on a free list and are reused by the next shot.
+MAX_BULLETS = 256
+
+class BulletPool:
+    def __init__(self, size=MAX_BULLETS):
+        self.x = array('d', [0.0]) * size
+        self.y = array('d', [0.0]) * size
+        self.dx = array('b', [0]) * size
+        self.dy = array('b', [0]) * size
+        self.free = list(range(size - 1, -1, -1))
+        self.live = []  # slots in use
+
+    def fire(self, x, y, direction):
+        if not self.free:  # Pool is full, drop the shot
+            return
+        i = self.free.pop()
+        self.x[i] = x
+        self.y[i] = y
+        self.dx[i] = direction[0]
+        self.dy[i] = direction[1]
+        self.live.append(i)
+
+    def clear(self):
+        self.free.extend(self.live)
+        self.live = []
+
+    # Move every bullet one frame, dropping the ones that hit a wall, leave the grid or hit an enemy
+    def update(self, maze, enemy_hash, occupancy):
+        step = BULLET_SPEED / FPS  # Move according to FPS
+        xs, ys, dxs, dys = self.x, self.y, self.dx, self.dy
+        cells = maze.cells
+        width = maze.width
+        keep = []
+        for i in self.live:
+            x = xs[i] + dxs[i] * step
+            y = ys[i] + dys[i] * step
+            xs[i] = x
+            ys[i] = y
+            cx = int(x + 0.5)
+            cy = int(y + 0.5)
+            if (x < 0 or x >= GRID_WIDTH or y < 0 or y >= GRID_HEIGHT
+                    or cells[cy * width + cx] == 1
+                    or check_collision_bullet_enemy(x, y, enemy_hash, occupancy)):
+                self.free.append(i)
+            else:
+                keep.append(i)
+        self.live = keep
 
     def draw(self, screen):
-        pygame.draw.circle(screen, GREEN, (int(self.x * GRID_SIZE + GRID_SIZE + GRID_SIZE // 2),
-                                             int(self.y * GRID_SIZE + GRID_SIZE + GRID_SIZE // 2)),
-                           GRID_SIZE // 4)  # Smaller circle for bullets
+        for i in self.live:
+            pygame.draw.circle(screen, GREEN, (int(self.x[i] * GRID_SIZE + GRID_SIZE + GRID_SIZE // 2),
+                                                 int(self.y[i] * GRID_SIZE + GRID_SIZE + GRID_SIZE // 2)),
+                               GRID_SIZE // 4)  # Smaller circle for bullets
+
+# Spatial hash over the maze cells for bullet/enemy hits.
+# Buckets are HIT_RANGE cells wide, so anything in range of a point is in
+# that point's bucket or one of the 8 around it.
+HIT_RANGE = 2  # bullet radius + enemy radius, in cells
+
+class SpatialHash:
+    def __init__(self, size=HIT_RANGE):
+        self.size = size
+        self.buckets = {}
+
+    def key(self, x, y):
+        return (int(x // self.size), int(y // self.size))
+
+    # objects are filed under their current x, y so remove before moving them
+    def add(self, obj):
+        self.buckets.setdefault(self.key(obj.x, obj.y), []).append(obj)
+
+    def remove(self, obj):
+        key = self.key(obj.x, obj.y)
+        bucket = self.buckets.get(key)
+        if bucket and obj in bucket:
+            bucket.remove(obj)
+            if not bucket:
+                del self.buckets[key]
+
+    def near(self, x, y):
+        kx, ky = self.key(x, y)
+        for by in (ky - 1, ky, ky + 1):
+            for bx in (kx - 1, kx, kx + 1):
+                bucket = self.buckets.get((bx, by))
+                if bucket:
+                    yield from bucket
 
 # Collision detection functions
-def check_collision_bullet_enemy(bullet, enemies):
+def check_collision_bullet_enemy(x, y, enemy_hash, occupancy):
     bullet_radius = 1
-    for enemy in enemies:
+    for enemy in enemy_hash.near(x, y):
         if enemy.alive:
             enemy_radius = 1
             # Calculate the distance between bullet and enemy center points
-            dist_x = bullet.x - enemy.x
-            dist_y = bullet.y - enemy.y
+            dist_x = x - enemy.x
+            dist_y = y - enemy.y
             distance_squared = dist_x ** 2 + dist_y ** 2
             # Compare with the combined radii squared
             if distance_squared <= (bullet_radius + enemy_radius) ** 2:
                 enemy.alive = False  # Mark enemy as dead
+                enemy_hash.remove(enemy)
+                occupancy.leave(enemy)
                 print("CHEESE")
                 return True
     return False
 
-def check_collision_player_enemy(player_pos, enemies):
-    for enemy in enemies:
-        if enemy.alive and player_pos[0] == enemy.x and player_pos[1] == enemy.y:
-            return True
-    return False
-
-# Maze generation
-def generate_maze(width, height):
-    maze = [[1 for _ in range(width)] for _ in range(height)]
-
-    def carve(x, y):
-        directions = [UP, DOWN, LEFT, RIGHT]
-        random.shuffle(directions)
-        for dx, dy in directions:
-            nx, ny = x + dx * 2, y + dy * 2
-            if 0 < nx < width and 0 < ny < height and maze[ny][nx] == 1:
-                maze[y + dy][x + dx] = 0
-                maze[ny][nx] = 0
-                carve(nx, ny)
-
-    maze[1][1] = 0  # Start point
-    carve(1, 1)
-    maze[height - 2][width - 2] = 0  # End point
-    return maze
+def check_collision_player_enemy(player_pos, occupancy):
+    return occupancy.enemy_at(player_pos[0], player_pos[1]) is not None
+
+# Maze generation (see mazegen.py for the algorithms)
+# Seeded mazes (daily challenges, shared runs) are kept on disk by mazefile.py
+def generate_maze(width, height, seed=None, algorithm="backtracker"):
+    if seed is not None:
+        return mazefile.cached(width, height, seed, algorithm)
+    return mazegen.generate(width, height, seed, algorithm)
+
+# Level pipeline: the next maze is generated on a worker thread while the
+# current level is played, so a level-up just picks up the finished maze.
+class LevelPipeline:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.pool = ThreadPoolExecutor(max_workers=1)
+        self.next = None
+
+    def prefetch(self):
+        self.next = self.pool.submit(generate_maze, self.width, self.height)
+
+    def take(self):
+        if self.next is None:
+            maze = generate_maze(self.width, self.height)
+        else:
+            maze = self.next.result()
+        self.prefetch()
+        return maze
 
 # Draw maze
-def draw_maze(screen, maze):
-    for y in range(GRID_HEIGHT):
-        for x in range(GRID_WIDTH):
-            color = BLACK if maze[y][x] == 1 else WHITE
-            pygame.draw.rect(screen, color, (x * GRID_SIZE + GRID_SIZE, y * GRID_SIZE + GRID_SIZE, GRID_SIZE, GRID_SIZE))
+# The maze only changes when a level is generated, so it is rendered once into
+# CHUNK x CHUNK cell surfaces and each frame just blits the chunks in view.
+CHUNK = 32
+
+class MazeView:
+    def __init__(self, maze):
+        self.maze = maze
+        self.chunks = {}
+
+    def chunk(self, cx, cy):
+        surface = self.chunks.get((cx, cy))
+        if surface is None:
+            maze = self.maze
+            surface = pygame.Surface((CHUNK * GRID_SIZE, CHUNK * GRID_SIZE)).convert()
+            surface.fill(BLACK)
+            for y in range(cy * CHUNK, min((cy + 1) * CHUNK, maze.height)):
+                row = maze[y]
+                for x in range(cx * CHUNK, min((cx + 1) * CHUNK, maze.width)):
+                    if row[x] == 0:
+                        pygame.draw.rect(surface, WHITE, ((x - cx * CHUNK) * GRID_SIZE, (y - cy * CHUNK) * GRID_SIZE, GRID_SIZE, GRID_SIZE))
+            self.chunks[(cx, cy)] = surface
+        return surface
+
+    # camera is the maze cell shown in the top left corner of the view
+    def draw(self, screen, camera=(0, 0)):
+        view = pygame.Rect(GRID_SIZE, GRID_SIZE, GRID_WIDTH * GRID_SIZE, GRID_HEIGHT * GRID_SIZE)
+        left = camera[0] // CHUNK
+        top = camera[1] // CHUNK
+        right = (camera[0] + GRID_WIDTH - 1) // CHUNK
+        bottom = (camera[1] + GRID_HEIGHT - 1) // CHUNK
+        blits = []
+        for cy in range(top, bottom + 1):
+            for cx in range(left, right + 1):
+                pos = (view.x + (cx * CHUNK - camera[0]) * GRID_SIZE, view.y + (cy * CHUNK - camera[1]) * GRID_SIZE)
+                blits.append((self.chunk(cx, cy), pos))
+        oldclip = screen.get_clip()
+        screen.set_clip(view)
+        screen.blits(blits, False)
+        screen.set_clip(oldclip)
 
 # Main function
 def main():
@@ -131,21 +301,36 @@ def main():
     start_time = pygame.time.get_ticks()
     timer_duration = 30 * 1000  # 30 seconds in milliseconds
     game_over = False
-    bullets = []
-    enemies = [Enemy(generate_maze(GRID_WIDTH + 1, GRID_HEIGHT + 1)) for _ in range(5)]
+    bullets = BulletPool()
+    levels = LevelPipeline(GRID_WIDTH + 1, GRID_HEIGHT + 1)
 
     while True:
-        # Generate maze for the current level
-        maze = generate_maze(GRID_WIDTH + 1, GRID_HEIGHT + 1)
+        # Take the maze for the current level, the next one starts generating
+        maze = levels.take()
         maze[end_pos[1]][end_pos[0]] = 0  # Ensure end position is a path
-
+        maze_view = MazeView(maze)
+        exit_field = mazepath.analyse(maze, end_pos)  # Distance to the exit from every cell
+        occupancy = Occupancy(maze)
+        enemies = []  # Place enemies in the real level, as many as there are free cells for
+        for _ in range(5):
+            if not occupancy.room(player_pos):
+                break
+            enemies.append(Enemy(occupancy, player_pos))
+        enemy_hash = SpatialHash()
+        for enemy in enemies:
+            enemy_hash.add(enemy)
+
+        profiler.reset()  # Don't count the level change as part of the first frame
         while True:
+            profiler.mark("events")
             for event in pygame.event.get():
+                profiler.handle(event)
                 if event.type == pygame.QUIT:
                     pygame.quit()
                     sys.exit()
 
             keys = pygame.key.get_pressed()
+            profiler.mark("update")
             if not game_over:  # Allow movement only when game is not over
                 # Player movement
                 if keys[pygame.K_UP]:
@@ -167,18 +352,36 @@ def main():
 
                 # Shooting with WASD
                 if keys[pygame.K_w]:
-                    bullets.append(Bullet(player_pos[0], player_pos[1], UP))
+                    bullets.fire(player_pos[0], player_pos[1], UP)
                 elif keys[pygame.K_a]:
-                    bullets.append(Bullet(player_pos[0], player_pos[1], LEFT))
+                    bullets.fire(player_pos[0], player_pos[1], LEFT)
                 elif keys[pygame.K_s]:
-                    bullets.append(Bullet(player_pos[0], player_pos[1], DOWN))
+                    bullets.fire(player_pos[0], player_pos[1], DOWN)
                 elif keys[pygame.K_d]:
-                    bullets.append(Bullet(player_pos[0], player_pos[1], RIGHT))
+                    bullets.fire(player_pos[0], player_pos[1], RIGHT)
 
+            # Move enemies
+            current_time = pygame.time.get_ticks()
+            for enemy in enemies:
+                if enemy.alive and current_time - enemy.teleport_time >= 10000:  # Teleport every 10 seconds
+                    enemy_hash.remove(enemy)
+                    enemy.teleport(occupancy, player_pos)
+                    enemy_hash.add(enemy)
+                    enemy.teleport_time = current_time
+
+            # Move bullets, dropping the ones that hit a wall or an enemy
+            profiler.mark("collision")
+            bullets.update(maze, enemy_hash, occupancy)
+
+            # Check for player and enemy collisions
+            if check_collision_player_enemy(player_pos, occupancy):
+                game_over = True
+
+            profiler.mark("draw")
             screen.fill(BLACK)
 
             # Draw maze
-            draw_maze(screen, maze)
+            maze_view.draw(screen)
 
             # Draw player
             pygame.draw.rect(screen, GREEN, (player_pos[0] * GRID_SIZE + GRID_SIZE,
@@ -190,33 +393,26 @@ def main():
                                             end_pos[1] * GRID_SIZE + GRID_SIZE,
                                             GRID_SIZE, GRID_SIZE))
 
-            # Update and draw bullets
-            for bullet in bullets[:]:
-                bullet.move()
-                bullet.draw(screen)
-                if bullet.x < 0 or bullet.x >= GRID_WIDTH or bullet.y < 0 or bullet.y >= GRID_HEIGHT:
-                    bullets.remove(bullet)
-                if check_collision_bullet_enemy(bullet, enemies):
-                    bullets.remove(bullet)  # Remove bullet if it hits an enemy
+            # Hold H for a hint: mark the next step towards the exit
+            if keys[pygame.K_h] and not game_over:
+                step = exit_field.next_step(player_pos[0], player_pos[1])
+                if step is not None and step != tuple(player_pos):
+                    pygame.draw.circle(screen, BLUE, (step[0] * GRID_SIZE + GRID_SIZE + GRID_SIZE // 2,
+                                                      step[1] * GRID_SIZE + GRID_SIZE + GRID_SIZE // 2), GRID_SIZE // 4)
 
-            # Move and draw enemies
-            current_time = pygame.time.get_ticks()
+            # Draw bullets
+            bullets.draw(screen)
+
+            # Draw enemies
             for enemy in enemies:
                 if enemy.alive:
                     enemy.draw(screen)
-                    if current_time - enemy.teleport_time >= 10000:  # Teleport every 10 seconds
-                        enemy.teleport(maze)
-                        enemy.teleport_time = current_time
-
-            # Check for player and enemy collisions
-            if check_collision_player_enemy(player_pos, enemies):
-                game_over = True
 
             # Timer display
             elapsed_time = pygame.time.get_ticks() - start_time
             remaining_time = max(0, timer_duration - elapsed_time)
             timer_text = f"Time: {remaining_time // 1000}"
-            font = pygame.font.Font(None, 36)
+            font = textcache.Font(None, 36)
             timer_surface = font.render(timer_text, True, WHITE)
             screen.blit(timer_surface, (10, 10))
 
@@ -225,7 +421,7 @@ def main():
                 game_over = True
 
             if game_over:
-                font = pygame.font.Font(None, 74)
+                font = textcache.Font(None, 74)
                 text = font.render("Game Over!", True, GREEN)
                 screen.blit(text, (WIDTH // 2 - text.get_width() // 2, HEIGHT // 2 - text.get_height() // 2))
 
@@ -241,7 +437,6 @@ def main():
                     start_time = pygame.time.get_ticks()  # Reset timer for next level
                     game_over = False
                     bullets.clear()  # Clear bullets for next level
-                    enemies = [Enemy(generate_maze(GRID_WIDTH + 1, GRID_HEIGHT + 1)) for _ in range(5)]  # Reset enemies
                     break  # Regenerate the maze for the next level
                 elif keys[pygame.K_q]:
                     pygame.quit()
@@ -262,11 +457,13 @@ def main():
                     start_time = pygame.time.get_ticks()  # Reset timer for next level
                     game_over = False
                     bullets.clear()  # Clear bullets for next level
-                    enemies = [Enemy(generate_maze(GRID_WIDTH + 1, GRID_HEIGHT + 1)) for _ in range(5)]  # Reset enemies
                     break  # Regenerate the maze for the next level
 
+            profiler.draw(screen)
+            profiler.mark("present")
             pygame.display.flip()
             clock.tick(FPS)
+            profiler.frame(FPS)
 
 if __name__ == "__main__":
     main()
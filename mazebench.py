@@ -0,0 +1,72 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import mazegen
+import mazefile
+
+# generate a batch of mazes across a process pool and report how fast it went.
+#   python mazebench.py 200 --width 201 --height 201 --algorithm prim
+#   python mazebench.py 50 --seed 1000 --out levels/   (also writes .maze files)
+# maze N uses seed + N, so the same command always builds the same set.
+
+try:
+    import resource
+except ImportError:  # not on windows
+    resource = None
+
+
+def build(job):
+    width, height, seed, algorithm = job
+    return seed, mazefile.dumps(mazegen.generate(width, height, seed, algorithm))
+
+
+# peak resident memory in MB for this process and for the workers
+def peak_memory():
+    if resource is None:
+        return None, None
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024  # bytes on mac, KB on linux
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    workers = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return own, workers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate mazes in bulk and time it.")
+    parser.add_argument("count", type=int, help="number of mazes")
+    parser.add_argument("--width", type=int, default=39)
+    parser.add_argument("--height", type=int, default=29)
+    parser.add_argument("--algorithm", choices=sorted(mazegen.ALGORITHMS), default="backtracker")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first maze")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--out", help="directory to write the mazes to")
+    args = parser.parse_args(argv)
+    if args.count < 1:
+        parser.error("count must be at least 1")
+    if not mazefile.SEED_MIN <= args.seed <= args.seed + args.count - 1 <= mazefile.SEED_MAX:
+        parser.error("seeds must fit in a signed 64 bit number")
+
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+    jobs = [(args.width, args.height, args.seed + i, args.algorithm) for i in range(args.count)]
+    chunk = max(1, args.count // (4 * args.workers))
+    size = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for seed, data in pool.map(build, jobs, chunksize=chunk):
+            size += len(data)
+            if args.out:
+                path = mazefile.cache_path(seed, args.width, args.height, args.algorithm, args.out)
+                mazefile.save_bytes(data, path)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.count} {args.algorithm} mazes of {args.width}x{args.height} on {args.workers} workers")
+    print(f"{elapsed:.2f} s, {args.count / elapsed:.1f} mazes/s, {size / 1024:.0f} KB packed")
+    own, workers = peak_memory()
+    if own is not None:
+        print(f"peak memory: {own:.1f} MB main, {workers:.1f} MB largest worker")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import mmap
+import os
+import struct
+import mazegen
+
+# compact files for mazes from mazegen.py.
+# layout: header, then one bit per cell row by row (1 = wall), first cell in the
+# top bit of the first byte, the last byte padded with zeros.
+#   magic "MAZE", version, width, height, seed (signed 64 bit), algorithm name length, algorithm name
+# open_mapped() reads straight out of a memory map, load() unpacks into a Maze.
+# cached() keeps seeded mazes in CACHE_DIR so they are only generated once.
+
+MAGIC = b"MAZE"
+VERSION = 1
+HEADER = struct.Struct("<4sBIIqB")
+SEED_MIN, SEED_MAX = -(1 << 63), (1 << 63) - 1  # seeds a file can hold
+CACHE_DIR = os.environ.get("MAZE_CACHE") or os.path.join(os.path.expanduser("~"), ".cache", "mazes")
+
+# byte 0/1 cells <-> "0"/"1" text, int() and bin() do the bit packing in C
+_TO_TEXT = bytes.maketrans(b"\x00\x01", b"01")
+_FROM_TEXT = bytes.maketrans(b"01", b"\x00\x01")
+
+
+def pack(maze):
+    n = len(maze.cells)
+    nbytes = (n + 7) // 8
+    if n == 0:
+        return bytes(nbytes)
+    bits = maze.cells.translate(_TO_TEXT) + b"0" * (nbytes * 8 - n)
+    return int(bits, 2).to_bytes(nbytes, "big")
+
+
+def unpack(data, count):
+    if count == 0:
+        return bytearray()
+    nbytes = (count + 7) // 8
+    bits = bin(int.from_bytes(data[:nbytes], "big"))[2:].zfill(nbytes * 8)
+    return bytearray(bits[:count].encode().translate(_FROM_TEXT))
+
+
+def dumps(maze):
+    if maze.seed is not None and not SEED_MIN <= maze.seed <= SEED_MAX:
+        raise ValueError(f"seed {maze.seed} does not fit in a maze file")
+    name = maze.algorithm.encode()
+    header = HEADER.pack(MAGIC, VERSION, maze.width, maze.height, maze.seed or 0, len(name))
+    return header + name + pack(maze)
+
+
+def save(maze, path):
+    save_bytes(dumps(maze), path)
+
+
+# write next to the target then rename, so a reader never sees half a file
+def save_bytes(data, path):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class MappedMaze:
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.map = None
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)  # fails on an empty file
+            if len(self.map) < HEADER.size:
+                raise ValueError(f"{path} is truncated")
+            magic, version, self.width, self.height, self.seed, namelen = HEADER.unpack_from(self.map, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a maze file")
+            start = HEADER.size
+            self.offset = start + namelen
+            if len(self.map) < self.offset + (self.width * self.height + 7) // 8:
+                raise ValueError(f"{path} is truncated")
+            self.algorithm = self.map[start:self.offset].decode()
+        except BaseException:
+            self.close()
+            raise
+
+    # single cells are read from the map without unpacking the rest
+    def is_wall(self, x, y):
+        i = y * self.width + x
+        return (self.map[self.offset + (i >> 3)] >> (7 - (i & 7))) & 1 == 1
+
+    def unpack(self):
+        cells = unpack(memoryview(self.map)[self.offset:], self.width * self.height)
+        return mazegen.Maze(self.width, self.height, self.seed, self.algorithm, cells)
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_mapped(path):
+    return MappedMaze(path)
+
+
+def load(path):
+    with MappedMaze(path) as mapped:
+        return mapped.unpack()
+
+
+def cache_path(seed, width, height, algorithm, directory=None):
+    return os.path.join(directory or CACHE_DIR, f"{algorithm}-{width}x{height}-{seed}.maze")
+
+
+# the maze for (seed, width, height, algorithm), from the cache if it has been made before
+def cached(width, height, seed, algorithm="backtracker", directory=None):
+    path = cache_path(seed, width, height, algorithm, directory)
+    try:
+        return load(path)
+    except (OSError, ValueError):
+        pass
+    maze = mazegen.generate(width, height, seed, algorithm)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        save(maze, path)
+    except (OSError, ValueError):
+        pass  # no cache (or a seed too big to store) is fine, the maze is still good
+    return maze
@@ -0,0 +1,173 @@
+import random
+
+# maze generation for maze.py, kept free of pygame.
+# cells are stored row by row in a bytearray, 1 = wall and 0 = path.
+# passages run between the odd cells, like the old recursive carve().
+# every algorithm uses an explicit stack or list, so big grids never hit the recursion limit.
+
+WALL = 1
+PATH = 0
+
+
+class Maze:
+    def __init__(self, width, height, seed=None, algorithm="backtracker", cells=None):
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self.algorithm = algorithm
+        if cells is None:
+            cells = bytearray(b"\x01") * (width * height)
+        self.cells = cells
+
+    # maze[y][x] works like the old list of lists, rows are views into cells
+    def __getitem__(self, y):
+        if y < 0 or y >= self.height:
+            raise IndexError(y)
+        return memoryview(self.cells)[y * self.width:(y + 1) * self.width]
+
+    def __len__(self):
+        return self.height
+
+    def is_wall(self, x, y):
+        return self.cells[y * self.width + x] == WALL
+
+    # all path cells as (x, y)
+    def open_cells(self):
+        w = self.width
+        return [(i % w, i // w) for i, c in enumerate(self.cells) if c == PATH]
+
+
+# the algorithms work on a lattice of the odd cells with a border of sentinels,
+# so a neighbour is just lattice index +-1 / +-lw and needs no bounds checks.
+# state per lattice cell: 0 = outside, 1 = untouched, 2 = waiting (prim), 3 = carved
+OUT, NEW, WAITING, DONE = 0, 1, 2, 3
+
+
+def _lattice(w, h):
+    # odd x from 1 up to w - 1, the same range the old carve() allowed
+    lw = (w - 2) // 2 + 1 + 2
+    lh = (h - 2) // 2 + 1 + 2
+    state = bytearray(lw * lh)
+    row = bytes([NEW]) * (lw - 2)
+    for ly in range(1, lh - 1):
+        state[ly * lw + 1:ly * lw + lw - 1] = row
+    # lattice step -> step in the cell grid
+    offsets = {1: 1, -1: -1, lw: w, -lw: -w}
+    return state, lw, offsets
+
+
+def _cell(c, lw, w):
+    return (2 * (c // lw) - 1) * w + 2 * (c % lw) - 1
+
+
+# depth-first search, the same kind of maze as the old recursive carve()
+def backtracker(cells, w, h, rng):
+    state, lw, offsets = _lattice(w, h)
+    rnd = rng.random
+    start = lw + 1
+    state[start] = DONE
+    cells[w + 1] = PATH
+    stack = [start]
+    cellstack = [w + 1]
+    while stack:
+        c = stack[-1]
+        options = []
+        if state[c + 1] == NEW:
+            options.append(1)
+        if state[c - 1] == NEW:
+            options.append(-1)
+        if state[c + lw] == NEW:
+            options.append(lw)
+        if state[c - lw] == NEW:
+            options.append(-lw)
+        if not options:
+            stack.pop()
+            cellstack.pop()
+            continue
+        d = options[int(rnd() * len(options))]
+        off = offsets[d]
+        i = cellstack[-1] + off
+        cells[i] = PATH
+        i += off
+        cells[i] = PATH
+        c += d
+        state[c] = DONE
+        stack.append(c)
+        cellstack.append(i)
+
+
+# randomised Prim's: grow from a random frontier cell each step
+def prim(cells, w, h, rng):
+    state, lw, offsets = _lattice(w, h)
+    dirs = (1, -1, lw, -lw)
+    rnd = rng.random
+    frontier = []
+    c = lw + 1
+    while True:
+        state[c] = DONE
+        i = _cell(c, lw, w)
+        cells[i] = PATH
+        links = []
+        for d in dirs:
+            s = state[c + d]
+            if s == NEW:
+                state[c + d] = WAITING
+                frontier.append(c + d)
+            elif s == DONE:
+                links.append(d)
+        if links:
+            d = links[int(rnd() * len(links))]
+            cells[i + offsets[d]] = PATH
+        if not frontier:
+            break
+        k = int(rnd() * len(frontier))
+        frontier[k], frontier[-1] = frontier[-1], frontier[k]
+        c = frontier.pop()
+
+
+# Wilson's: loop-erased random walks, every spanning tree is equally likely
+def wilson(cells, w, h, rng):
+    state, lw, offsets = _lattice(w, h)
+    dirs = (1, -1, lw, -lw)
+    rnd = rng.random
+    way = {}  # lattice cell -> step taken when last leaving it
+    todo = [c for c in range(len(state)) if state[c] == NEW]
+    rng.shuffle(todo)
+    c = todo.pop()
+    state[c] = DONE
+    cells[_cell(c, lw, w)] = PATH
+    for start in todo:
+        if state[start] == DONE:
+            continue
+        # walk until we hit the maze, overwriting the way out of revisited cells
+        c = start
+        while state[c] != DONE:
+            d = dirs[int(rnd() * 4)]
+            if state[c + d] == OUT:
+                continue
+            way[c] = d
+            c += d
+        # carve the loop-erased path
+        c = start
+        i = _cell(c, lw, w)
+        while state[c] != DONE:
+            d = way[c]
+            off = offsets[d]
+            state[c] = DONE
+            cells[i] = PATH
+            cells[i + off] = PATH
+            c += d
+            i += 2 * off
+        way.clear()
+
+
+ALGORITHMS = {"backtracker": backtracker, "prim": prim, "wilson": wilson}
+
+
+def generate(width, height, seed=None, algorithm="backtracker"):
+    if seed is None:
+        seed = random.randrange(1 << 32)
+    maze = Maze(width, height, seed, algorithm)
+    ALGORITHMS[algorithm](maze.cells, width, height, random.Random(seed))
+    maze.cells[(height - 2) * width + width - 2] = PATH  # End point
+    return maze
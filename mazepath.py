@@ -0,0 +1,91 @@
+import heapq
+from array import array
+from collections import OrderedDict, deque
+
+# pathfinding for mazes from mazegen.py, kept free of pygame.
+# analyse() runs one BFS back from the exit when a level is made, after that the
+# distance to the exit and the next step towards it are array lookups.
+# astar() answers one-off queries between any two cells.
+
+MAX_CACHED = 8  # exit fields kept, keyed by maze seed, size, algorithm and exit
+
+
+class ExitField:
+    def __init__(self, maze, goal):
+        w = maze.width
+        cells = maze.cells
+        self.width = w
+        self.goal = tuple(goal)
+        self.dist = array('i', [-1]) * len(cells)  # steps to the exit, -1 if unreachable
+        self.next = array('i', [-1]) * len(cells)  # cell index one step closer to the exit
+        start = goal[1] * w + goal[0]
+        self.dist[start] = 0
+        self.next[start] = start
+        queue = deque([start])
+        while queue:
+            i = queue.popleft()
+            d = self.dist[i] + 1
+            for j in (i + 1, i - 1, i + w, i - w):
+                if 0 <= j < len(cells) and cells[j] == 0 and self.dist[j] == -1:
+                    self.dist[j] = d
+                    self.next[j] = i
+                    queue.append(j)
+
+    def distance(self, x, y):
+        return self.dist[y * self.width + x]
+
+    # the cell to move to from (x, y) to get closer to the exit, None if there is no way
+    def next_step(self, x, y):
+        j = self.next[y * self.width + x]
+        if j == -1:
+            return None
+        return (j % self.width, j // self.width)
+
+
+_cache = OrderedDict()
+
+
+def analyse(maze, goal):
+    key = (maze.seed, maze.width, maze.height, maze.algorithm, tuple(goal))
+    field = _cache.get(key)
+    if field is None:
+        field = ExitField(maze, goal)
+        # mazes without a seed can't be told apart, so only seeded ones are kept
+        if maze.seed is not None:
+            _cache[key] = field
+            if len(_cache) > MAX_CACHED:
+                _cache.popitem(last=False)
+    else:
+        _cache.move_to_end(key)
+    return field
+
+
+# shortest path from start to goal as a list of (x, y), None if there is none
+def astar(maze, start, goal):
+    w = maze.width
+    cells = maze.cells
+    gx, gy = goal
+    s = start[1] * w + start[0]
+    g = gy * w + gx
+    came = {s: s}
+    cost = {s: 0}
+    heap = [(abs(start[0] - gx) + abs(start[1] - gy), 0, s)]
+    while heap:
+        _, c, i = heapq.heappop(heap)
+        if i == g:
+            path = []
+            while i != s:
+                path.append((i % w, i // w))
+                i = came[i]
+            path.append(tuple(start))
+            path.reverse()
+            return path
+        if c > cost[i]:
+            continue
+        for j in (i + 1, i - 1, i + w, i - w):
+            if 0 <= j < len(cells) and cells[j] == 0 and (j not in cost or c + 1 < cost[j]):
+                cost[j] = c + 1
+                came[j] = i
+                x, y = j % w, j // w
+                heapq.heappush(heap, (c + 1 + abs(x - gx) + abs(y - gy), c + 1, j))
+    return None
@@ -0,0 +1,119 @@
+import math
+import random
+from cellindex import CellIndex
+
+# spawn spots for collisions.py, kept free of pygame.
+# a Poisson-disk set of candidate centres (no two closer than spacing) is made
+# once for the field. spot() hands out candidates from a free list, checked
+# against the entity index and the areas to avoid, so respawns don't land on
+# the player or on each other. a candidate stays taken until its owner is
+# placed again or reset() is called.
+
+
+def poisson_disk(width, height, spacing, rng, margin=0, tries=30):
+    # Bridson's algorithm, with a background grid of one point per cell
+    size = spacing / math.sqrt(2)
+    cols = int((width - 2 * margin) // size) + 1
+    rows = int((height - 2 * margin) // size) + 1
+    grid = [None] * (cols * rows)
+    points = []
+
+    def cell(x, y):
+        return int((x - margin) // size), int((y - margin) // size)
+
+    def fits(x, y):
+        if not (margin <= x <= width - margin and margin <= y <= height - margin):
+            return False
+        gx, gy = cell(x, y)
+        for ny in range(max(0, gy - 2), min(rows, gy + 3)):
+            for nx in range(max(0, gx - 2), min(cols, gx + 3)):
+                p = grid[ny * cols + nx]
+                if p is not None and (p[0] - x) ** 2 + (p[1] - y) ** 2 < spacing * spacing:
+                    return False
+        return True
+
+    def add(x, y):
+        gx, gy = cell(x, y)
+        grid[gy * cols + gx] = (x, y)
+        points.append((x, y))
+        active.append((x, y))
+
+    active = []
+    add(rng.uniform(margin, width - margin), rng.uniform(margin, height - margin))
+    while active:
+        k = rng.randrange(len(active))
+        x, y = active[k]
+        for _ in range(tries):
+            angle = rng.uniform(0, 2 * math.pi)
+            d = rng.uniform(spacing, 2 * spacing)
+            nx = x + math.cos(angle) * d
+            ny = y + math.sin(angle) * d
+            if fits(nx, ny):
+                add(nx, ny)
+                break
+        else:
+            active[k] = active[-1]
+            active.pop()
+    return points
+
+
+class Placer:
+    def __init__(self, width, height, spacing, margin=0, clearance=0, seed=None, tries=8):
+        self.width = width
+        self.height = height
+        self.clearance = clearance  # free space kept around a placed box
+        self.tries = tries  # random spots tried once every candidate is taken
+        self.rng = random.Random(seed)
+        self.points = poisson_disk(width, height, spacing, self.rng, margin)
+        self.reset()
+
+    # every candidate free again, for a new game
+    def reset(self):
+        self.free = CellIndex(range(len(self.points)))  # candidates nobody holds
+        self.held = {}  # owner -> candidate it was given
+
+    # top left of a free size x size box for owner, the entity that will stand there.
+    # index is an entities.EntityIndex and avoid a list of (x, y, w, h) areas
+    def spot(self, size, index, avoid=(), owner=None):
+        half = size / 2
+        gap = self.clearance
+        slot = self.held.pop(owner, None)
+        if slot is not None:
+            self.free.add(slot)
+        # every free candidate at most once, from a random starting point;
+        # one can still be blocked by something that moved onto it
+        n = len(self.free)
+        start = self.rng.randrange(n) if n else 0
+        for k in range(n):
+            c = self.free[(start + k) % n]
+            cx, cy = self.points[c]
+            x = int(max(0, min(cx - half, self.width - size)))
+            y = int(max(0, min(cy - half, self.height - size)))
+            if self.clear(x - gap, y - gap, size + 2 * gap, index, avoid, owner):
+                self.free.discard(c)
+                self.held[owner] = c
+                return x, y
+        # every candidate is taken: try random spots clear of everything, then
+        # settle for overlapping other entities but never the areas in avoid
+        for check in (index, None):
+            for _ in range(self.tries):
+                x = self.rng.randint(0, self.width - size)
+                y = self.rng.randint(0, self.height - size)
+                if self.clear(x - gap, y - gap, size + 2 * gap, check, avoid, owner):
+                    return x, y
+        for y in range(0, self.height - size + 1, size):
+            for x in range(0, self.width - size + 1, size):
+                if self.clear(x, y, size, None, avoid, owner):
+                    return x, y
+        raise ValueError("avoid covers the whole field")
+
+    def clear(self, x, y, s, index, avoid, ignore):
+        for ax, ay, aw, ah in avoid:
+            if x < ax + aw and ax < x + s and y < ay + ah and ay < y + s:
+                return False
+        if index is None:
+            return True
+        for e in index.near(x, y, s, s):
+            if e is not ignore and x < e.x + e.size and e.x < x + s and y < e.y + e.size and e.y < y + s:
+                return False
+        return True
@@ -0,0 +1,135 @@
+import atexit
+import os
+import pygame
+import textcache
+from collections import deque
+from time import perf_counter_ns
+
+# frame timing for the game loops.
+# call mark("phase") where each phase of the frame starts and frame(fps) once per frame.
+# nothing is recorded until F3 is pressed (see handle) or GAME_PROFILE is set:
+#   GAME_PROFILE=frames.csv      one row per phase per frame
+#   GAME_PROFILE=frames.json     chrome://tracing / Perfetto trace
+# while profiling is off mark() and frame() return straight away.
+
+enabled = False
+overlay = False
+
+_history = deque(maxlen=600)  # last ~10 s of frame times in ns
+_phases = []  # (name, start_ns, dur_ns) for the current frame
+_phase = None
+_phasestart = 0
+_framestart = 0
+_framecount = 0
+_dropped = 0
+_text = ""
+_font = None
+_out = None
+_json = False
+_first = True
+
+
+def start(path=None):
+    global enabled, _out, _json, _framestart, _phase
+    _phase = None
+    enabled = True
+    _framestart = perf_counter_ns()
+    _phases.clear()
+    if path and _out is None:
+        _json = path.endswith(".json")
+        _out = open(path, "w")
+        if _json:
+            _out.write("[\n")
+        else:
+            _out.write("frame,phase,start_us,dur_us\n")
+        atexit.register(stop)
+
+
+def stop():
+    global enabled, _out
+    enabled = False
+    if _out is not None:
+        if _json:
+            _out.write("\n]\n")
+        _out.close()
+        _out = None
+
+
+# forget a half finished frame. game loops call this before their first frame,
+# otherwise the time spent in menus since the last loop ended would be counted
+# as one long phase of the next frame
+def reset():
+    global _phase, _framestart
+    _phase = None
+    _phases.clear()
+    _framestart = perf_counter_ns()
+
+
+# start a new phase, closing the one before it
+def mark(name):
+    global _phase, _phasestart
+    if not enabled:
+        return
+    now = perf_counter_ns()
+    if _phase is not None:
+        _phases.append((_phase, _phasestart, now - _phasestart))
+    _phase = name
+    _phasestart = now
+
+
+# end of frame: store the timings and refresh the overlay numbers
+def frame(fps=60):
+    global _phase, _framestart, _framecount, _dropped, _text, _first
+    if not enabled:
+        return
+    now = perf_counter_ns()
+    if _phase is not None:
+        _phases.append((_phase, _phasestart, now - _phasestart))
+        _phase = None
+    dur = now - _framestart
+    _framestart = now
+    _framecount += 1
+    _history.append(dur)
+    if dur > 1.5 * 1e9 / fps:
+        _dropped += 1
+    if _out is not None:
+        for name, start, length in _phases:
+            if _json:
+                if not _first:
+                    _out.write(",\n")
+                _first = False
+                _out.write('{"name": "%s", "ph": "X", "pid": 1, "tid": 1, "ts": %.1f, "dur": %.1f, "args": {"frame": %d}}'
+                           % (name, start / 1000, length / 1000, _framecount))
+            else:
+                _out.write("%d,%s,%.1f,%.1f\n" % (_framecount, name, start / 1000, length / 1000))
+    _phases.clear()
+    if overlay and _framecount % 30 == 0:
+        times = sorted(_history)
+        p50 = times[len(times) // 2] / 1e6
+        p99 = times[min(len(times) - 1, len(times) * 99 // 100)] / 1e6
+        _text = f"p50 {p50:.1f}ms  p99 {p99:.1f}ms  dropped {_dropped}"
+
+
+# F3 switches the overlay (and recording) on and off
+def handle(event):
+    global overlay, enabled
+    if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+        overlay = not overlay
+        if overlay and not enabled:
+            start()
+        elif not overlay and _out is None:
+            enabled = False
+
+
+def draw(surface):
+    global _font
+    if not overlay or not _text:
+        return
+    if _font is None:
+        _font = textcache.Font(None, 24)
+    surf = _font.render(_text, True, (255, 255, 0), (0, 0, 0))
+    surface.blit(surf, (surface.get_width() - surf.get_width() - 5, surface.get_height() - surf.get_height() - 5))
+
+
+if os.environ.get("GAME_PROFILE"):
+    start(os.environ["GAME_PROFILE"])
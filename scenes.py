@@ -0,0 +1,45 @@
+# scene stack shared by the menu-driven games.
+# a scene is a function that runs its own loop until it calls goto/push/pop
+# (checked with changed()) and then returns, so run() stays at a constant depth
+# no matter how many times the player goes menu -> game -> death -> menu.
+
+_stack = []
+_changed = False
+
+
+def changed():
+    return _changed
+
+
+# swap everything on the stack for a new scene
+def goto(scene):
+    global _changed
+    _stack.clear()
+    _stack.append(scene)
+    _changed = True
+
+
+# open a scene on top of the current one, pop() comes back to it
+def push(scene):
+    global _changed
+    _stack.append(scene)
+    _changed = True
+
+
+def pop():
+    global _changed
+    if _stack:
+        _stack.pop()
+    _changed = True
+
+
+def run(first):
+    global _changed
+    goto(first)
+    while _stack:
+        scene = _stack[-1]
+        _changed = False
+        scene()
+        # a scene that returns without picking a new one is finished
+        if not _changed and _stack and _stack[-1] is scene:
+            _stack.pop()
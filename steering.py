@@ -0,0 +1,109 @@
+import math
+from array import array
+
+# steering for homing things in collisions.py, kept free of pygame.
+# positions and velocities are floats in flat arrays (agent i is index i), so
+# nothing is lost to Rect rounding, and update() moves the whole flock in one
+# pass: seek towards a target, flee from it, and keep apart from each other.
+# the game copies the positions out to its entities after each update.
+
+
+class Swarm:
+    def __init__(self, max_speed, max_force=None, radius=20, bounds=None):
+        self.max_speed = max_speed
+        self.max_force = max_speed if max_force is None else max_force  # max change in velocity per step
+        self.radius = radius  # agents closer than two radii push each other apart
+        self.bounds = bounds  # (width, height) the centres are kept inside, or None
+        self.px = array('d')
+        self.py = array('d')
+        self.vx = array('d')
+        self.vy = array('d')
+
+    def __len__(self):
+        return len(self.px)
+
+    def add(self, x, y):
+        self.px.append(x)
+        self.py.append(y)
+        self.vx.append(0.0)
+        self.vy.append(0.0)
+        return len(self.px) - 1
+
+    # jump agent i to (x, y) standing still, e.g. after it was caught
+    def place(self, i, x, y):
+        self.px[i] = x
+        self.py[i] = y
+        self.vx[i] = 0.0
+        self.vy[i] = 0.0
+
+    # agents grouped by cells of one separation distance, so neighbours are in the 3x3 around
+    def _cells(self, size):
+        cells = {}
+        px, py = self.px, self.py
+        for i in range(len(px)):
+            cells.setdefault((int(px[i] // size), int(py[i] // size)), []).append(i)
+        return cells
+
+    def update(self, tx, ty, seek=1.0, flee=0.0, separation=1.0):
+        px, py, vx, vy = self.px, self.py, self.vx, self.vy
+        max_speed = self.max_speed
+        max_force = self.max_force
+        apart = 2 * self.radius
+        cells = self._cells(apart) if separation and len(px) > 1 else None
+        for i in range(len(px)):
+            x = px[i]
+            y = py[i]
+            # seek wants full speed towards the target, flee full speed away from it
+            dx = tx - x
+            dy = ty - y
+            d = math.hypot(dx, dy)
+            if d > 0:
+                k = (seek - flee) * max_speed / d
+                wx = dx * k
+                wy = dy * k
+            else:
+                wx = wy = 0.0
+            if cells is not None:
+                sx = sy = 0.0
+                cx = int(x // apart)
+                cy = int(y // apart)
+                for ny in (cy - 1, cy, cy + 1):
+                    for nx in (cx - 1, cx, cx + 1):
+                        for j in cells.get((nx, ny), ()):
+                            if j == i:
+                                continue
+                            ox = x - px[j]
+                            oy = y - py[j]
+                            od = math.hypot(ox, oy)
+                            if 0 < od < apart:
+                                # push harder the closer they are
+                                k = (apart - od) / (apart * od)
+                                sx += ox * k
+                                sy += oy * k
+                wx += sx * separation * max_speed
+                wy += sy * separation * max_speed
+            # turn towards the wanted velocity, limited by max_force, then cap the speed
+            fx = wx - vx[i]
+            fy = wy - vy[i]
+            f = math.hypot(fx, fy)
+            if f > max_force:
+                fx *= max_force / f
+                fy *= max_force / f
+            nvx = vx[i] + fx
+            nvy = vy[i] + fy
+            s = math.hypot(nvx, nvy)
+            if s > max_speed:
+                nvx *= max_speed / s
+                nvy *= max_speed / s
+            vx[i] = nvx
+            vy[i] = nvy
+        # move everyone after all the velocities are worked out
+        r = self.radius
+        for i in range(len(px)):
+            x = px[i] + vx[i]
+            y = py[i] + vy[i]
+            if self.bounds is not None:
+                x = max(r, min(x, self.bounds[0] - r))
+                y = max(r, min(y, self.bounds[1] - r))
+            px[i] = x
+            py[i] = y
@@ -0,0 +1,52 @@
+import pygame
+from collections import OrderedDict
+
+# font and rendered text cache shared by the games.
+# textcache.Font / textcache.SysFont take the same arguments as pygame's, load each
+# face and size once and remember the surfaces they render, so HUD text that has
+# not changed since the last frame is just a dictionary lookup.
+# rendered surfaces are shared, so blit them but don't draw on them.
+
+MAX_RENDERED = 256  # rendered surfaces kept, least recently used are dropped first
+
+_fonts = {}
+_rendered = OrderedDict()
+
+
+class CachedFont:
+    def __init__(self, key, font):
+        self.key = key
+        self.font = font
+
+    def render(self, text, antialias, color, background=None):
+        key = (self.key, text, antialias, tuple(color), None if background is None else tuple(background))
+        surface = _rendered.get(key)
+        if surface is not None:
+            _rendered.move_to_end(key)
+            return surface
+        if background is None:
+            surface = self.font.render(text, antialias, color)
+        else:
+            surface = self.font.render(text, antialias, color, background)
+        _rendered[key] = surface
+        if len(_rendered) > MAX_RENDERED:
+            _rendered.popitem(last=False)
+        return surface
+
+    # everything else (size, get_height, ...) goes straight to the pygame font
+    def __getattr__(self, name):
+        return getattr(self.font, name)
+
+
+def Font(name, size):
+    key = ("file", name, size)
+    if key not in _fonts:
+        _fonts[key] = CachedFont(key, pygame.font.Font(name, size))
+    return _fonts[key]
+
+
+def SysFont(name, size, bold=False, italic=False):
+    key = ("sys", name, size, bold, italic)
+    if key not in _fonts:
+        _fonts[key] = CachedFont(key, pygame.font.SysFont(name, size, bold, italic))
+    return _fonts[key]